@@ -1,21 +1,335 @@
 # chat_handler.py
+import asyncio
+import functools
+import hashlib
 import json
-import os
 import logging
+import re
+import sys
 
-from rich import print
+from prompt_toolkit import PromptSession
+from prompt_toolkit.formatted_text import ANSI
+from rich.console import Console
 from rich.markdown import Markdown
 from rich.panel import Panel
-from rich.prompt import Prompt
+from rich.text import Text
 
-from mcpcli.llm_client import LLMClient
-from mcpcli.system_prompt_generator import SystemPromptGenerator
-from mcpcli.tools_handler import convert_to_openai_tools, fetch_tools, handle_tool_call
+from mcpcli.memory import RECALL_MEMORY_TOOL, RECALL_MEMORY_TOOL_NAME, ConversationMemory
+from mcpcli.tools_handler import convert_to_openai_tools, fetch_tools, format_tool_response, handle_tool_call
 from mcpcli.messages.send_call_tool import send_call_tool
 
+# orjson is an optional speedup; fall back to the stdlib json module
+try:
+    import orjson
+
+    # Options for displaying JSON: indented, sorted keys; orjson always emits UTF-8
+    _DUMP_OPTS = orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS | orjson.OPT_SORT_KEYS
+except ImportError:
+    orjson = None
+
 # Configure logging
 logger = logging.getLogger(__name__)
 
+# Static guidelines appended to every generated system prompt
+_GUIDELINES = """
+
+**GENERAL GUIDELINES:**
+
+1. Step-by-step reasoning:
+   - Analyze tasks systematically.
+   - Break down complex problems into smaller, manageable parts.
+   - Verify assumptions at each step to avoid errors.
+   - Reflect on results to improve subsequent actions.
+
+2. Effective tool usage:
+   - Explore:
+     - Identify available information and verify its structure.
+     - Check assumptions and understand data relationships.
+   - Iterate:
+     - Start with simple queries or actions.
+     - Build upon successes, adjusting based on observations.
+   - Handle errors:
+     - Carefully analyze error messages.
+     - Use errors as a guide to refine your approach.
+     - Document what went wrong and suggest fixes.
+
+3. Clear communication:
+   - Explain your reasoning and decisions at each step.
+   - Share discoveries transparently with the user.
+   - Outline next steps or ask clarifying questions as needed.
+
+EXAMPLES OF BEST PRACTICES:
+
+- Working with databases:
+  - Check schema before writing queries.
+  - Verify the existence of columns or tables.
+  - Start with basic queries and refine based on results.
+
+- Processing data:
+  - Validate data formats and handle edge cases.
+  - Ensure integrity and correctness of results.
+
+- Accessing resources:
+  - Confirm resource availability and permissions.
+  - Handle missing or incomplete data gracefully.
+
+REMEMBER:
+- Be thorough and systematic.
+- Each tool call should have a clear and well-explained purpose.
+- Make reasonable assumptions if ambiguous.
+- Minimize unnecessary user interactions by providing actionable insights.
+
+EXAMPLES OF ASSUMPTIONS:
+- Default sorting (e.g., descending order) if not specified.
+- Assume basic user intentions, such as fetching top results by a common metric.
+"""
+
+# Cache of (system prompt, openai tools) keyed by a hash of the tool list
+_PROMPT_CACHE: dict[str, tuple[str, list]] = {}
+
+# Instructions used to condense older turns into the running summary
+_SUMMARY_INSTRUCTIONS = (
+    "Summarize the following conversation excerpt in a few concise sentences. "
+    "Keep facts, decisions, tool results and open questions that later turns may need."
+)
+
+# Shared console used for all chat output
+_console = Console()
+
+# Characters and line prefixes that indicate a response needs Markdown rendering
+_MD_PAT = re.compile(r"[`#*_\[|]|^\s*(?:[-+>]|\d+[.)])\s", re.MULTILINE)
+
+
+def _loads(data):
+    """Parse a JSON string, using orjson when it is available."""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def _dumps_canonical(obj) -> bytes:
+    """Serialize an object as compact JSON bytes with sorted keys."""
+    if orjson is not None:
+        return orjson.dumps(obj, option=orjson.OPT_SORT_KEYS)
+    return json.dumps(obj, sort_keys=True, separators=(",", ":")).encode()
+
+
+def _dumps_pretty(obj) -> str:
+    """Serialize an object as indented, key-sorted, non-ASCII-escaped JSON for display."""
+    if orjson is not None:
+        return orjson.dumps(obj, option=_DUMP_OPTS).decode()
+    return json.dumps(obj, indent=2, ensure_ascii=False, sort_keys=True)
+
+
+@functools.lru_cache(maxsize=None)
+def _prompt_session() -> PromptSession:
+    """Return the shared prompt session, creating it on first use."""
+    return PromptSession()
+
+
+async def get_input(prompt: str) -> str:
+    """
+    Read a line of user input without blocking the event loop.
+
+    The prompt may contain Rich markup. Ctrl-C is reported as EOFError, the
+    same as Ctrl-D, so callers can treat both as the end of input.
+    """
+    with _console.capture() as capture:
+        _console.print(f"{prompt} ", end="")
+    try:
+        return (await _prompt_session().prompt_async(ANSI(capture.get()))).strip()
+    except KeyboardInterrupt:
+        raise EOFError
+
+
+def _needs_markdown(text: str) -> bool:
+    """Return whether text contains Markdown syntax worth rendering."""
+    return _MD_PAT.search(text) is not None
+
+
+def _assistant_panel(text: str) -> Panel:
+    """Build the assistant panel, skipping Markdown parsing for plain text."""
+    body = Markdown(text) if _needs_markdown(text) else Text(text)
+    return Panel(body, style="bold blue", title="Assistant")
+
+
+class _StreamingPanel:
+    """
+    Assistant panel for a response that is still streaming in.
+
+    The text is joined only when Live refreshes, not on every delta, and is
+    shown plain; Markdown is rendered once the response is complete.
+    """
+
+    def __init__(self, chunks):
+        self.chunks = chunks
+
+    def __rich__(self) -> Panel:
+        return Panel(Text("".join(self.chunks)), style="bold blue", title="Assistant")
+
+
+@functools.lru_cache(maxsize=None)
+def _tool_call_header(tool_name: str) -> str:
+    """Return the Markdown header shown above a tool's invocation arguments."""
+    return f"**Tool Call:** {tool_name}\n\n```json\n"
+
+
+def _pop_dropped_turns(conversation_history, history_window):
+    """
+    Remove and return the messages that fall outside the history window.
+
+    The window holds the most recent history_window messages after the system
+    prompt. It is aligned to start at a user message, so it never begins with
+    tool responses (or the assistant message that requested them) cut off from
+    the rest of their exchange. If the window holds no user message, it is
+    extended back to the latest one instead.
+    """
+    messages = conversation_history[1:]
+    if len(messages) <= history_window:
+        return []
+
+    cut = len(messages) - history_window
+    start = next((i for i in range(cut, len(messages)) if messages[i]["role"] == "user"), None)
+    if start is None:
+        start = next((i for i in range(cut - 1, -1, -1) if messages[i]["role"] == "user"), 0)
+
+    dropped = messages[:start]
+    del conversation_history[1:start + 1]
+    return dropped
+
+
+def _request_messages(conversation_history, summary_message):
+    """Return the messages to send: the history plus any running summary."""
+    if summary_message["content"]:
+        return [conversation_history[0], summary_message, *conversation_history[1:]]
+    return conversation_history
+
+
+async def _summarize(client, summary_message, messages, lock):
+    """Summarize dropped messages with the LLM and append the result to the summary."""
+    # tool results hold an MCP content list; only their text is summarized
+    transcript = "\n".join(
+        f"{message['role']}: {format_tool_response(message['content'])}"
+        for message in messages
+        if message.get("content")
+    )
+    prompt = [
+        {"role": "system", "content": _SUMMARY_INSTRUCTIONS},
+        {"role": "user", "content": transcript},
+    ]
+
+    # the lock keeps summaries in the order their turns were dropped
+    async with lock:
+        try:
+            completion = await client.create_completion(messages=prompt)
+        except Exception as e:
+            logger.debug(f"Error summarizing conversation: {e}")
+            return
+
+        summary = completion.get("response")
+        if summary:
+            if summary_message["content"]:
+                summary_message["content"] += f"\n{summary}"
+            else:
+                summary_message["content"] = f"Conversation so far:\n{summary}"
+
+
+async def _stream_completion(client, messages, tools):
+    """
+    Stream a completion, rendering the assistant's text in a live panel.
+
+    Returns the full response text, the tool calls and whether a panel was shown.
+    """
+    # only needed once a response streams in
+    from rich.live import Live
+
+    chunks = []
+    tool_calls = []
+    live = None
+    try:
+        async for delta in client.stream_completion(messages=messages, tools=tools):
+            text = delta.get("response")
+            if text:
+                chunks.append(text)
+                if live is None:
+                    live = Live(_StreamingPanel(chunks), console=_console, refresh_per_second=8)
+                    live.start()
+            tool_calls.extend(delta.get("tool_calls") or ())
+    finally:
+        if live is not None:
+            live.update(_assistant_panel("".join(chunks)))
+            live.stop()
+
+    return "".join(chunks), tool_calls, live is not None
+
+
+def _is_cacheable(tool) -> bool:
+    """
+    Return whether a tool's results may be reused for identical calls.
+
+    Tools must opt in with "x-cacheable": true or the MCP annotation
+    readOnlyHint: true. Un-annotated tools may mutate state (the MCP defaults
+    are readOnlyHint: false, destructiveHint: true), so they are never cached.
+    An explicit "x-cacheable": false always wins.
+    """
+    cacheable = tool.get("x-cacheable")
+    if cacheable is not None:
+        return cacheable is True
+    annotations = tool.get("annotations") or {}
+    return annotations.get("readOnlyHint") is True
+
+
+async def _call_tools(pending, tool_cache=None, cacheable_tools=frozenset()):
+    """
+    Send pending tool calls concurrently, yielding (index, result) as each completes.
+
+    Each call's server is either a (read_stream, write_stream) pair or an
+    in-process handler with a call_tool coroutine. Calls to different servers
+    run in parallel. Calls to the same server are serialized, because
+    responses on a server's read stream are not matched to requests by id.
+    Exceptions are yielded in place of results.
+
+    If tool_cache is given, successful results of server tools in
+    cacheable_tools are stored in it, keyed by tool name and canonical
+    arguments, and identical calls are answered from it. A call to any other
+    server tool clears the cache, since it may have changed server state.
+    """
+    locks = {}
+
+    async def call(index, tool_name, arguments, server):
+        try:
+            if not isinstance(server, tuple):
+                return index, await server.call_tool(tool_name, arguments)
+
+            key = None
+            if tool_cache is not None and tool_name in cacheable_tools:
+                key = (tool_name, _dumps_canonical(arguments))
+
+            read_stream, write_stream = server
+            lock = locks.setdefault(id(write_stream), asyncio.Lock())
+            async with lock:
+                if key is not None and key in tool_cache:
+                    return index, tool_cache[key]
+
+                result = await send_call_tool(tool_name, arguments, read_stream, write_stream)
+
+            if key is not None:
+                if not result.get("isError"):
+                    tool_cache[key] = result
+            elif tool_cache:
+                tool_cache.clear()
+            return index, result
+        except Exception as e:
+            return index, e
+
+    calls = [
+        call(index, name, arguments, server)
+        for index, (_, name, arguments, server) in enumerate(pending)
+    ]
+    for next_done in asyncio.as_completed(calls):
+        yield await next_done
+
+
 async def handle_chat_mode(server_streams, provider="openai", model="gpt-4o-mini", debug=False):
     """Enter chat mode with multi-call support for autonomous tool chaining."""
     try:
@@ -26,28 +340,56 @@ async def handle_chat_mode(server_streams, provider="openai", model="gpt-4o-mini
             for tool in server_tools:
                 tool_name = tool.get('name')
                 if tool_name:
+                    # intern tool names so per-call lookups compare by identity
+                    tool_name = sys.intern(tool_name)
                     tools.append(tool)
                     tool_to_server[tool_name] = (read_stream, write_stream)
 
         if not tools:
-            print("[red]No tools available. Exiting chat mode.[/red]")
+            _console.print("[red]No tools available. Exiting chat mode.[/red]")
             return
 
-        system_prompt = generate_system_prompt(tools)
-        openai_tools = convert_to_openai_tools(tools)
+        # Sort tools by name so the system prompt and tool definitions are
+        # byte-identical across sessions, whatever order the servers report
+        tools.sort(key=lambda tool: tool["name"])
+        system_prompt, openai_tools = get_prompt_and_tools(tools)
+
+        # The system prompt stays first and unchanged for the whole session,
+        # so provider-side prompt caching can reuse it on every turn
         conversation_history = [{"role": "system", "content": system_prompt}]
 
+        # Create the LLM client once so its connections are reused across turns.
+        # It is imported here because the provider SDKs dominate start-up time
+        # and are not needed by commands other than chat.
+        from mcpcli.llm_client import LLMClient, close_http_client
+
+        client = LLMClient(provider=provider, model=model)
+
+        # Earlier turns are offered through a recall_memory tool rather than
+        # injected into the system prompt, which would defeat prompt caching
+        memory = None
+        if RECALL_MEMORY_TOOL_NAME not in tool_to_server:
+            memory = ConversationMemory()
+            tool_to_server[RECALL_MEMORY_TOOL_NAME] = memory
+            openai_tools = [*openai_tools, *convert_to_openai_tools([RECALL_MEMORY_TOOL])]
+
         # Pass the tool_to_server mapping and tools to the conversation processor
-        await process_conversation(
-            client=None,  # LLMClient will be instantiated within process_conversation
-            conversation_history=conversation_history,
-            openai_tools=openai_tools,
-            tool_to_server=tool_to_server,
-            tools=tools,
-            debug=debug
-        )
+        try:
+            await process_conversation(
+                client=client,
+                conversation_history=conversation_history,
+                openai_tools=openai_tools,
+                tool_to_server=tool_to_server,
+                tools=tools,
+                debug=debug,
+                memory=memory,
+            )
+        finally:
+            # Close pooled connections while the event loop is still running
+            await client.aclose()
+            await close_http_client()
     except Exception as e:
-        print(f"[red]Error in chat mode:[/red] {e}")
+        _console.print(f"[red]Error in chat mode:[/red] {e}")
 
 
 async def process_conversation(
@@ -56,151 +398,209 @@ async def process_conversation(
     openai_tools,
     tool_to_server,
     tools,
-    debug=False
+    debug=False,
+    history_window: int = 12,
+    memory=None,
 ):
-    """Process the conversation loop, handling tool calls and responses."""
-    # Initialize LLMClient here to ensure it's used within the correct context
-    provider = os.getenv("LLM_PROVIDER", "openai")
-    model = os.getenv("LLM_MODEL", "gpt-4o-mini")
-    client = LLMClient(provider=provider, model=model)
+    """
+    Process the conversation loop, handling tool calls and responses.
+
+    Only the system prompt, a running summary and the last history_window
+    messages are sent with each completion. Messages that fall out of that
+    window are removed from the history and summarized in the background.
+    They are also added to memory, if given, for the recall_memory tool.
+    """
     # conversation_history already contains the system prompt
+    valid_tools = frozenset(tool_to_server)
+
+    # Results of identical tool calls are reused within the session
+    tool_cache = {}
+    cacheable_tools = frozenset(tool["name"] for tool in tools if _is_cacheable(tool))
+
+    # Running summary of turns folded out of the history
+    summary_message = {"role": "system", "content": ""}
+    summary_lock = asyncio.Lock()
+    summary_tasks = set()
+
+    def fold_dropped_turns():
+        """Move messages outside the window into memory and the running summary."""
+        dropped = _pop_dropped_turns(conversation_history, history_window)
+        if not dropped:
+            return
+        if memory is not None:
+            memory.add_messages(dropped)
+        task = asyncio.create_task(_summarize(client, summary_message, dropped, summary_lock))
+        summary_tasks.add(task)
+        task.add_done_callback(summary_tasks.discard)
+
+    # Panels with constant content are built once and reused
+    exit_panel = Panel("Exiting chat mode.", style="bold red")
+    empty_user_panel = Panel("[No Message]", style="bold yellow", title="You")
 
     while True:
         try:
-            user_message = Prompt.ask("[bold yellow]>[/bold yellow]").strip()
+            try:
+                user_message = await get_input("[bold yellow]>[/bold yellow]")
+            except EOFError:
+                user_message = "exit"
+
             if user_message.lower() in ["exit", "quit"]:
-                print(Panel("Exiting chat mode.", style="bold red"))
+                _console.print(exit_panel)
                 break
 
-            user_panel_text = user_message if user_message else "[No Message]"
-            print(Panel(user_panel_text, style="bold yellow", title="You"))
+            if user_message:
+                _console.print(Panel(user_message, style="bold yellow", title="You"))
+            else:
+                _console.print(empty_user_panel)
 
             conversation_history.append({"role": "user", "content": user_message})
-            completion = client.create_completion(
-                messages=conversation_history,
-                tools=openai_tools,
+            fold_dropped_turns()
+            response_content, tool_calls, displayed = await _stream_completion(
+                client, _request_messages(conversation_history, summary_message), openai_tools
             )
 
-            response_content = completion.get("response", "No response")
-            tool_calls = completion.get("tool_calls", [])
-
             if tool_calls:
-                tool_responses = []  # Collect all tool responses
-                # First, add the assistant's message with tool calls
+                # First, add the assistant's message with tool calls, parsing
+                # each call's arguments once for the dispatch below
+                tc_list = []
+                tc_append = tc_list.append
+                parsed_calls = []
+                parsed_append = parsed_calls.append
+                for tc in tool_calls:
+                    fn = tc["function"]
+                    fn_name = fn["name"]
+                    fn_arguments = fn["arguments"]
+                    tc_append({"id": tc["id"], "type": "function",
+                               "function": {"name": fn_name, "arguments": fn_arguments}})
+                    try:
+                        arguments = _loads(fn_arguments or "{}")
+                    except json.JSONDecodeError as e:
+                        arguments = e
+                    parsed_append((tc, fn_name, fn_arguments, arguments))
+
                 assistant_message = {
                     "role": "assistant",
-                    "content": response_content if response_content else "I'll help you with that.",
-                    "tool_calls": [
-                        {
-                            "id": tool_call.id,
-                            "type": "function",
-                            "function": {
-                                "name": tool_call.function.name,
-                                "arguments": tool_call.function.arguments
-                            }
-                        } for tool_call in tool_calls
-                    ]
+                    "content": response_content or "I'll help you with that.",
+                    "tool_calls": tc_list,
                 }
                 conversation_history.append(assistant_message)
 
-                for tool_call in tool_calls:
-                    try:
-                        tool_name = tool_call.function.name
-                    except AttributeError:
-                        print(f"[red]Error: 'function' attribute not found in tool_call: {tool_call}[/red]")
-                        continue
-
+                # Phase 1: validate each tool call and show the invocation
+                pending = []
+                for tool_call, tool_name, arguments_str, arguments in parsed_calls:
                     if not tool_name:
-                        print(f"[red]Invalid tool call: {tool_call}[/red]")
+                        _console.print(f"[red]Invalid tool call: {tool_call}[/red]")
                         continue
 
-                    server_stream = tool_to_server.get(tool_name)
-                    if not server_stream:
-                        print(f"[red]Tool '{tool_name}' not found on any server.[/red]")
+                    tool_name = sys.intern(tool_name)
+                    if tool_name not in valid_tools:
+                        _console.print(f"[red]Tool '{tool_name}' not found on any server.[/red]")
                         continue
+                    server_stream = tool_to_server[tool_name]
 
-                    read_stream, write_stream = server_stream
-                    try:
-                        arguments_str = tool_call.function.arguments or "{}"
-                        arguments = json.loads(arguments_str)
-                    except json.JSONDecodeError as e:
-                        print(f"[red]Error parsing arguments for tool '{tool_name}': {e}[/red]")
-                        arguments = {}
-                    except AttributeError:
-                        print(f"[red]Error: 'arguments' attribute not found in tool_call.function: {tool_call.function}[/red]")
+                    if isinstance(arguments, json.JSONDecodeError):
+                        _console.print(f"[red]Error parsing arguments for tool '{tool_name}': {arguments}[/red]")
                         arguments = {}
+                        arguments_str = None
 
                     # Display Tool Invocation
-                    # Encode arguments as JSON with ensure_ascii=False for proper Unicode display
-                    formatted_args = json.dumps(arguments, indent=2, ensure_ascii=False)
-                    tool_md = f"**Tool Call:** {tool_name}\n\n```json\n{formatted_args}\n```"
-                    print(
+                    # The raw arguments are shown as-is; they are only re-encoded
+                    # (indented UTF-8 JSON) in debug mode or when they were invalid
+                    if debug or not arguments_str:
+                        formatted_args = _dumps_pretty(arguments)
+                    else:
+                        formatted_args = arguments_str
+                    tool_md = f"{_tool_call_header(tool_name)}{formatted_args}\n```"
+                    _console.print(
                         Panel(
                             Markdown(tool_md), style="bold magenta", title="Tool Invocation"
                         )
                     )
 
-                    # Send the tool call to the appropriate server
-                    result = await send_call_tool(tool_name, arguments, read_stream, write_stream)
+                    pending.append((tool_call, tool_name, arguments, server_stream))
+
+                # Phase 2: send the tool calls to their servers concurrently, handling
+                # each response as soon as it arrives while slower calls continue.
+                # Responses are stored in the original tool call order.
+                tool_responses = [None] * len(pending)
+                async for index, result in _call_tools(pending, tool_cache, cacheable_tools):
+                    tool_call, tool_name, _, _ = pending[index]
+                    if isinstance(result, Exception):
+                        result = {"isError": True, "error": str(result)}
+
                     if result.get("isError"):
                         error_msg = result.get("error", "Unknown error")
-                        print(f"[red]Error calling tool '{tool_name}': {error_msg}[/red]")
-                        tool_responses.append({
-                            "tool_call_id": tool_call.id,
+                        _console.print(f"[red]Error calling tool '{tool_name}': {error_msg}[/red]")
+                        tool_responses[index] = {
+                            "tool_call_id": tool_call["id"],
                             "role": "tool",
                             "name": tool_name,
                             "content": f"Error: {error_msg}"
-                        })
+                        }
                     else:
                         response_content = result.get("content", "No content")
                         if debug:
                             logger.debug(f"Tool Response for {tool_name}: {response_content}")
-                            print(
+                            _console.print(
                                 Panel(
                                     Markdown(f"### Tool Response\n\n{response_content}"),
                                     style="green",
                                 )
                             )
-                        tool_responses.append({
-                            "tool_call_id": tool_call.id,
+                        tool_responses[index] = {
+                            "tool_call_id": tool_call["id"],
                             "role": "tool",
                             "name": tool_name,
                             "content": response_content
-                        })
+                        }
 
-                # Add tool responses to conversation history
-                for tool_response in tool_responses:
-                    # Ensure tool response content is not null
-                    if tool_response["content"] is None:
-                        tool_response["content"] = "No response from tool"
-                    conversation_history.append(tool_response)
+                # Add tool responses to conversation history, ensuring content is not null
+                conversation_history.extend(
+                    tr if tr["content"] is not None else {**tr, "content": "No response from tool"}
+                    for tr in tool_responses
+                )
 
                 # Get LLM's interpretation of the tool responses
-                completion = client.create_completion(
-                    messages=conversation_history,
-                    tools=openai_tools,
+                fold_dropped_turns()
+                response_content, _, displayed = await _stream_completion(
+                    client, _request_messages(conversation_history, summary_message), openai_tools
                 )
 
-                response_content = completion.get("response") or "I processed the tool responses but have nothing specific to add."
-                # Display the LLM's response
-                assistant_panel_text = response_content if response_content else "[No Response]"
-                print(
-                    Panel(Markdown(assistant_panel_text), style="bold blue", title="Assistant")
-                )
+                response_content = response_content or "I processed the tool responses but have nothing specific to add."
+                # Display the LLM's response if nothing was streamed
+                if not displayed:
+                    _console.print(_assistant_panel(response_content))
                 conversation_history.append({"role": "assistant", "content": response_content})
                 continue
 
-            # Assistant panel with Markdown
-            assistant_panel_text = response_content if response_content else "[No Response]"
-            print(
-                Panel(Markdown(assistant_panel_text), style="bold blue", title="Assistant")
-            )
+            # Assistant panel with Markdown, if nothing was streamed
+            if not displayed:
+                _console.print(_assistant_panel("[No Response]"))
             conversation_history.append({"role": "assistant", "content": response_content})
 
         except Exception as e:
-            print(f"[red]Error processing message:[/red] {e}")
+            _console.print(f"[red]Error processing message:[/red] {e}")
             continue
 
+    # Summaries are only useful while the conversation is running
+    for task in summary_tasks:
+        task.cancel()
+
+
+def get_prompt_and_tools(tools):
+    """
+    Return the system prompt and OpenAI tool definitions for a tool list.
+
+    Results are cached by a hash of the tools, so re-entering chat mode with
+    the same servers skips regenerating both.
+    """
+    key = hashlib.blake2b(_dumps_canonical(tools)).hexdigest()
+    cached = _PROMPT_CACHE.get(key)
+    if cached is None:
+        cached = (generate_system_prompt(tools), convert_to_openai_tools(tools))
+        _PROMPT_CACHE[key] = cached
+    return cached
+
 
 def generate_system_prompt(tools):
     """
@@ -208,60 +608,10 @@ def generate_system_prompt(tools):
 
     This prompt is internal and not displayed to the user.
     """
+    from mcpcli.system_prompt_generator import SystemPromptGenerator
+
     prompt_generator = SystemPromptGenerator()
     tools_json = {"tools": tools}
 
     system_prompt = prompt_generator.generate_prompt(tools_json)
-    system_prompt += """
-
-**GENERAL GUIDELINES:**
-
-1. Step-by-step reasoning:
-   - Analyze tasks systematically.
-   - Break down complex problems into smaller, manageable parts.
-   - Verify assumptions at each step to avoid errors.
-   - Reflect on results to improve subsequent actions.
-
-2. Effective tool usage:
-   - Explore:
-     - Identify available information and verify its structure.
-     - Check assumptions and understand data relationships.
-   - Iterate:
-     - Start with simple queries or actions.
-     - Build upon successes, adjusting based on observations.
-   - Handle errors:
-     - Carefully analyze error messages.
-     - Use errors as a guide to refine your approach.
-     - Document what went wrong and suggest fixes.
-
-3. Clear communication:
-   - Explain your reasoning and decisions at each step.
-   - Share discoveries transparently with the user.
-   - Outline next steps or ask clarifying questions as needed.
-
-EXAMPLES OF BEST PRACTICES:
-
-- Working with databases:
-  - Check schema before writing queries.
-  - Verify the existence of columns or tables.
-  - Start with basic queries and refine based on results.
-
-- Processing data:
-  - Validate data formats and handle edge cases.
-  - Ensure integrity and correctness of results.
-
-- Accessing resources:
-  - Confirm resource availability and permissions.
-  - Handle missing or incomplete data gracefully.
-
-REMEMBER:
-- Be thorough and systematic.
-- Each tool call should have a clear and well-explained purpose.
-- Make reasonable assumptions if ambiguous.
-- Minimize unnecessary user interactions by providing actionable insights.
-
-EXAMPLES OF ASSUMPTIONS:
-- Default sorting (e.g., descending order) if not specified.
-- Assume basic user intentions, such as fetching top results by a common metric.
-"""
-    return system_prompt
+    return "".join([system_prompt, _GUIDELINES])
@@ -1,17 +1,70 @@
 import logging
 import os
 import uuid
-from typing import Any, Dict, List
+from typing import Any, AsyncIterator, Dict, List
 import json
 
+import httpx
 import ollama
 from dotenv import load_dotenv
-from openai import OpenAI
-from anthropic import Anthropic
+from openai import AsyncOpenAI
+from anthropic import AsyncAnthropic
+
+from mcpcli.tools_handler import format_tool_response
 
 # Load environment variables
 load_dotenv()
 
+# Shared HTTP/2 connection pool for the OpenAI client
+_http_client = None
+
+
+def _get_http_client() -> httpx.AsyncClient:
+    """Return the shared keep-alive HTTP client, creating it on first use."""
+    global _http_client
+    if _http_client is None:
+        _http_client = httpx.AsyncClient(
+            http2=True,
+            timeout=httpx.Timeout(60.0, connect=5.0),
+            limits=httpx.Limits(max_keepalive_connections=32, keepalive_expiry=120),
+        )
+    return _http_client
+
+
+async def close_http_client():
+    """Close the shared HTTP client, if one was created."""
+    global _http_client
+    if _http_client is not None:
+        client, _http_client = _http_client, None
+        await client.aclose()
+
+
+def _ollama_messages(messages: List[Dict]) -> List[Dict]:
+    """Convert OpenAI-style messages, including tool exchanges, for Ollama."""
+    ollama_messages = []
+    for msg in messages:
+        # tool results hold an MCP content list, but Ollama expects a string
+        ollama_message = {
+            "role": msg["role"],
+            "content": format_tool_response(msg["content"]) if isinstance(msg["content"], list) else msg["content"],
+        }
+        if msg.get("tool_calls"):
+            ollama_message["tool_calls"] = [
+                {
+                    "function": {
+                        "name": tool_call["function"]["name"],
+                        "arguments": (
+                            json.loads(tool_call["function"]["arguments"] or "{}")
+                            if isinstance(tool_call["function"]["arguments"], str)
+                            else tool_call["function"]["arguments"]
+                        ),
+                    }
+                }
+                for tool_call in msg["tool_calls"]
+            ]
+        ollama_messages.append(ollama_message)
+    return ollama_messages
+
 
 class LLMClient:
     def __init__(self, provider="openai", model="gpt-4o-mini", api_key=None):
@@ -20,6 +73,9 @@ class LLMClient:
         self.model = model
         self.api_key = api_key
 
+        # async sdk client, created on first use and reused across calls
+        self._async_client = None
+
         # ensure we have the api key for openai if set
         if provider == "openai":
             self.api_key = self.api_key or os.getenv("OPENAI_API_KEY")
@@ -34,34 +90,89 @@ class LLMClient:
         elif provider == "ollama" and not hasattr(ollama, "chat"):
             raise ValueError("Ollama is not properly configured in this environment.")
 
-    def create_completion(
+    async def create_completion(
         self, messages: List[Dict], tools: List = None
     ) -> Dict[str, Any]:
         """Create a chat completion using the specified LLM provider."""
         if self.provider == "openai":
             # perform an openai completion
-            return self._openai_completion(messages, tools)
+            return await self._openai_completion(messages, tools)
         elif self.provider == "anthropic":
             # perform an anthropic completion
-            return self._anthropic_completion(messages, tools)
+            return await self._anthropic_completion(messages, tools)
         elif self.provider == "ollama":
             # perform an ollama completion
-            return self._ollama_completion(messages, tools)
+            return await self._ollama_completion(messages, tools)
+        else:
+            # unsupported providers
+            raise ValueError(f"Unsupported provider: {self.provider}")
+
+    def _get_async_client(self):
+        """Return the provider's async SDK client, creating it on first use."""
+        if self._async_client is None:
+            if self.provider == "openai":
+                self._async_client = AsyncOpenAI(
+                    api_key=self.api_key, http_client=_get_http_client()
+                )
+            elif self.provider == "anthropic":
+                # newer anthropic releases no longer accept an httpx client,
+                # so the SDK keeps its own connection pool
+                self._async_client = AsyncAnthropic(api_key=self.api_key)
+            else:
+                self._async_client = ollama.AsyncClient()
+        return self._async_client
+
+    async def aclose(self):
+        """
+        Close this client's provider SDK client.
+
+        The shared HTTP client is left open for other clients; it is closed
+        with close_http_client().
+        """
+        client, self._async_client = self._async_client, None
+        if client is None or self.provider == "openai":
+            # AsyncOpenAI.close() would close the shared HTTP client
+            return
+        try:
+            if hasattr(client, "close"):
+                await client.close()
+        except Exception as e:
+            logging.debug(f"Error closing {self.provider} client: {e}")
+
+    async def stream_completion(
+        self, messages: List[Dict], tools: List = None
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Stream a chat completion using the specified LLM provider.
+
+        Yields dicts holding a "response" text delta and/or a "tool_calls" list.
+        Each tool call is yielded once it is complete, in OpenAI format with its
+        arguments as a JSON string.
+        """
+        if self.provider == "openai":
+            stream = self._openai_stream(messages, tools)
+        elif self.provider == "anthropic":
+            stream = self._anthropic_stream(messages, tools)
+        elif self.provider == "ollama":
+            stream = self._ollama_stream(messages, tools)
         else:
             # unsupported providers
             raise ValueError(f"Unsupported provider: {self.provider}")
 
-    def _openai_completion(self, messages: List[Dict], tools: List) -> Dict[str, Any]:
+        async for delta in stream:
+            yield delta
+
+    async def _openai_completion(self, messages: List[Dict], tools: List) -> Dict[str, Any]:
         """Handle OpenAI chat completions."""
         # get the openai client
-        client = OpenAI(api_key=self.api_key)
+        client = self._get_async_client()
 
         try:
-            # make a request, passing in tools
-            response = client.chat.completions.create(
+            # make a request, passing in tools (openai rejects an empty tools list)
+            response = await client.chat.completions.create(
                 model=self.model,
                 messages=messages,
-                tools=tools or [],
+                **({"tools": tools} if tools else {}),
             )
 
             # return the response
@@ -74,94 +185,151 @@ class LLMClient:
             logging.error(f"OpenAI API Error: {str(e)}")
             raise ValueError(f"OpenAI API Error: {str(e)}")
 
-    def _anthropic_completion(self, messages: List[Dict], tools: List) -> Dict[str, Any]:
-        """Handle Anthropic chat completions."""
-        # get the anthropic client
-        client = Anthropic(api_key=self.api_key)
+    async def _openai_stream(
+        self, messages: List[Dict], tools: List
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """Handle streaming OpenAI chat completions."""
+        # get the openai client
+        client = self._get_async_client()
 
         try:
-            # format messages for anthropic api
-            anthropic_messages = []
-            system_messages = []
-            for msg in messages:
-                if msg["role"] == "system":
-                    system_messages.append({
+            # make a streaming request, passing in tools
+            stream = await client.chat.completions.create(
+                model=self.model,
+                messages=messages,
+                stream=True,
+                **({"tools": tools} if tools else {}),
+            )
+
+            # tool calls arrive in fragments, keyed by their index
+            pending = {}
+            async for chunk in stream:
+                if not chunk.choices:
+                    continue
+                delta = chunk.choices[0].delta
+
+                if delta.content:
+                    yield {"response": delta.content}
+
+                for fragment in delta.tool_calls or []:
+                    if fragment.index not in pending:
+                        # a new index means the previous tool calls are complete
+                        completed = [pending.pop(index) for index in sorted(pending)]
+                        if completed:
+                            yield {"tool_calls": completed}
+                        pending[fragment.index] = {
+                            "id": fragment.id,
+                            "type": "function",
+                            "function": {"name": "", "arguments": ""},
+                        }
+                    function = pending[fragment.index]["function"]
+                    if fragment.function and fragment.function.name:
+                        function["name"] += fragment.function.name
+                    if fragment.function and fragment.function.arguments:
+                        function["arguments"] += fragment.function.arguments
+
+            if pending:
+                yield {"tool_calls": [pending[index] for index in sorted(pending)]}
+        except Exception as e:
+            # error
+            logging.error(f"OpenAI API Error: {str(e)}")
+            raise ValueError(f"OpenAI API Error: {str(e)}")
+
+    def _anthropic_request(self, messages: List[Dict], tools: List) -> Dict[str, Any]:
+        """Build the Anthropic messages request from OpenAI-style messages and tools."""
+        # format messages for anthropic api
+        anthropic_messages = []
+        system_messages = []
+        for msg in messages:
+            if msg["role"] == "system":
+                system_messages.append({
+                    "type": "text",
+                    "text": msg["content"]
+                })
+            elif msg["role"] == "tool":
+                anthropic_messages.append({
+                    "role": "user",
+                    "content": [{
+                        "type": "tool_result",
+                        "tool_use_id": msg["tool_call_id"],
+                        "content": msg["content"]
+                    }]
+                })
+            elif msg["role"] == "assistant" and "tool_calls" in msg:
+                content = []
+                if msg["content"]:
+                    content.append({
                         "type": "text",
                         "text": msg["content"]
                     })
-                elif msg["role"] == "tool":
-                    anthropic_messages.append({
-                        "role": "user",
-                        "content": [{
-                            "type": "tool_result",
-                            "tool_use_id": msg["tool_call_id"],
-                            "content": msg["content"]
-                        }]
-                    })
-                elif msg["role"] == "assistant" and "tool_calls" in msg:
-                    content = []
-                    if msg["content"]:
-                        content.append({
-                            "type": "text",
-                            "content": msg["content"]
-                        })
-
-                    for tool_call in msg["tool_calls"]:
-                        content.append({
-                            "type": "tool_use",
-                            "id": tool_call["id"],
-                            "name": tool_call["function"]["name"],
-                            "input":(
-                                json.loads(tool_call["function"]["arguments"])
-                                if isinstance(tool_call["function"]["arguments"], str)
-                                else tool_call["function"]["arguments"]
-                            )
-                        })
-
-                    anthropic_messages.append({
-                        "role": msg["role"],
-                        "content": content
-                    })
-                else:
-                    anthropic_messages.append({
-                        "role": msg["role"],
-                        "content": [{
-                            "type": "text",
-                            "text": msg["content"]
-                        }]
-                    })
 
-            # add prompt caching markers
-            if len(system_messages) > 0:
-                system_messages[-1]["cache_control"] = {"type": "ephemeral"}
-            if len(anthropic_messages) > 0:
-                anthropic_messages[-1]["content"][-1]["cache_control"] = {"type": "ephemeral"}
-            if len(anthropic_messages) > 2:
-                anthropic_messages[-3]["content"][-1]["cache_control"] = {"type": "ephemeral"}
-
-            # format tools for anthropic api
-            if tools:
-                anthropic_tools = []
-                for tool in tools:
-                    anthropic_tools.append({
-                        "name": tool["function"]["name"],
-                        "description": tool["function"]["description"],
-                        "input_schema": tool["function"]["parameters"]
+                for tool_call in msg["tool_calls"]:
+                    content.append({
+                        "type": "tool_use",
+                        "id": tool_call["id"],
+                        "name": tool_call["function"]["name"],
+                        "input":(
+                            json.loads(tool_call["function"]["arguments"])
+                            if isinstance(tool_call["function"]["arguments"], str)
+                            else tool_call["function"]["arguments"]
+                        )
                     })
-                # add prompt caching marker
-                if len(anthropic_tools) > 0:
-                    anthropic_tools[-1]["cache_control"] = {"type": "ephemeral"}
+
+                anthropic_messages.append({
+                    "role": msg["role"],
+                    "content": content
+                })
             else:
-                anthropic_tools = None
+                anthropic_messages.append({
+                    "role": msg["role"],
+                    "content": [{
+                        "type": "text",
+                        "text": msg["content"]
+                    }]
+                })
+
+        # add prompt caching markers
+        if len(system_messages) > 0:
+            system_messages[-1]["cache_control"] = {"type": "ephemeral"}
+        if len(anthropic_messages) > 0:
+            anthropic_messages[-1]["content"][-1]["cache_control"] = {"type": "ephemeral"}
+        if len(anthropic_messages) > 2:
+            anthropic_messages[-3]["content"][-1]["cache_control"] = {"type": "ephemeral"}
+
+        # format tools for anthropic api
+        if tools:
+            anthropic_tools = []
+            for tool in tools:
+                anthropic_tools.append({
+                    "name": tool["function"]["name"],
+                    "description": tool["function"]["description"],
+                    "input_schema": tool["function"]["parameters"]
+                })
+            # add prompt caching marker
+            if len(anthropic_tools) > 0:
+                anthropic_tools[-1]["cache_control"] = {"type": "ephemeral"}
+        else:
+            anthropic_tools = None
+
+        request = {
+            "model": self.model,
+            "system": system_messages,
+            "messages": anthropic_messages,
+            "max_tokens": 8192,
+        }
+        # leave tools out entirely when there are none
+        if anthropic_tools:
+            request["tools"] = anthropic_tools
+        return request
 
+    async def _anthropic_completion(self, messages: List[Dict], tools: List) -> Dict[str, Any]:
+        """Handle Anthropic chat completions."""
+        # get the anthropic client
+        client = self._get_async_client()
+
+        try:
             # make a reuest, passing in tools
-            response = client.messages.create(
-                model=self.model,
-                system=system_messages,
-                tools=anthropic_tools,
-                messages=anthropic_messages,
-                max_tokens=8192
-            )
+            response = await client.messages.create(**self._anthropic_request(messages, tools))
 
             # format tool calls
             tool_calls = []
@@ -185,16 +353,49 @@ class LLMClient:
             # error
             raise ValueError(f"Anthropic API Error: {repr(e)}")
 
-    def _ollama_completion(self, messages: List[Dict], tools: List) -> Dict[str, Any]:
+    async def _anthropic_stream(
+        self, messages: List[Dict], tools: List
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """Handle streaming Anthropic chat completions."""
+        # get the anthropic client
+        client = self._get_async_client()
+
+        try:
+            # make a streaming request, passing in tools
+            stream = await client.messages.create(
+                **self._anthropic_request(messages, tools), stream=True
+            )
+
+            # the tool_use block currently being streamed, if any
+            tool_call = None
+            async for event in stream:
+                if event.type == "content_block_start" and event.content_block.type == "tool_use":
+                    tool_call = {
+                        "id": event.content_block.id,
+                        "type": "function",
+                        "function": {"name": event.content_block.name, "arguments": ""},
+                    }
+                elif event.type == "content_block_delta":
+                    if event.delta.type == "text_delta":
+                        yield {"response": event.delta.text}
+                    elif event.delta.type == "input_json_delta" and tool_call:
+                        tool_call["function"]["arguments"] += event.delta.partial_json
+                elif event.type == "content_block_stop" and tool_call:
+                    tool_call["function"]["arguments"] = tool_call["function"]["arguments"] or "{}"
+                    yield {"tool_calls": [tool_call]}
+                    tool_call = None
+        except Exception as e:
+            # error
+            raise ValueError(f"Anthropic API Error: {repr(e)}")
+
+    async def _ollama_completion(self, messages: List[Dict], tools: List) -> Dict[str, Any]:
         """Handle Ollama chat completions."""
         # Format messages for Ollama
-        ollama_messages = [
-            {"role": msg["role"], "content": msg["content"]} for msg in messages
-        ]
+        ollama_messages = _ollama_messages(messages)
 
         try:
             # Make API call with tools
-            response = ollama.chat(
+            response = await self._get_async_client().chat(
                 model=self.model,
                 messages=ollama_messages,
                 stream=False,
@@ -230,3 +431,45 @@ class LLMClient:
             # error
             logging.error(f"Ollama API Error: {str(e)}")
             raise ValueError(f"Ollama API Error: {str(e)}")
+
+    async def _ollama_stream(
+        self, messages: List[Dict], tools: List
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """Handle streaming Ollama chat completions."""
+        # Format messages for Ollama
+        ollama_messages = _ollama_messages(messages)
+
+        try:
+            # Make a streaming API call with tools
+            stream = await self._get_async_client().chat(
+                model=self.model,
+                messages=ollama_messages,
+                stream=True,
+                tools=tools or [],
+            )
+
+            async for chunk in stream:
+                message = chunk.message
+                if message.content:
+                    yield {"response": message.content}
+
+                # Ollama sends complete tool calls; convert them to OpenAI format
+                if message.tool_calls:
+                    yield {
+                        "tool_calls": [
+                            {
+                                "id": str(uuid.uuid4()),  # Generate unique ID
+                                "type": "function",
+                                "function": {
+                                    "name": tool.function.name,
+                                    "arguments": json.dumps(tool.function.arguments),
+                                },
+                            }
+                            for tool in message.tool_calls
+                        ]
+                    }
+
+        except Exception as e:
+            # error
+            logging.error(f"Ollama API Error: {str(e)}")
+            raise ValueError(f"Ollama API Error: {str(e)}")
@@ -0,0 +1,121 @@
+# memory.py
+import math
+import re
+from collections import Counter
+from typing import Any, Dict, List
+
+from mcpcli.tools_handler import format_tool_response
+
+# Name of the in-process memory tool exposed to the LLM
+RECALL_MEMORY_TOOL_NAME = "recall_memory"
+
+# MCP-style definition of the memory tool
+RECALL_MEMORY_TOOL = {
+    "name": RECALL_MEMORY_TOOL_NAME,
+    "description": (
+        "Search earlier parts of this conversation that are no longer in context. "
+        "Use it when the user refers to something discussed before that you cannot see."
+    ),
+    "inputSchema": {
+        "type": "object",
+        "properties": {
+            "query": {
+                "type": "string",
+                "description": "What to look for in the earlier conversation.",
+            },
+            "limit": {
+                "type": "integer",
+                "description": "Maximum number of memories to return (default 3).",
+            },
+        },
+        "required": ["query"],
+    },
+}
+
+_TOKEN_PATTERN = re.compile(r"\w+")
+
+
+def _tokenize(text: str) -> List[str]:
+    """Split text into lowercase word tokens."""
+    return _TOKEN_PATTERN.findall(text.lower())
+
+
+class ConversationMemory:
+    """
+    An in-process store of earlier conversation messages, searchable by the LLM
+    through the recall_memory tool.
+
+    Entries are ranked by the query terms they share, weighted by inverse
+    document frequency, so rare terms count for more than common ones.
+    """
+
+    def __init__(self):
+        """
+        Initialize an empty memory.
+        """
+        self.entries: List[str] = []
+        self._entry_tokens: List[Counter] = []
+        self._document_frequency: Counter = Counter()
+
+    def add_messages(self, messages: List[Dict[str, Any]]) -> None:
+        """
+        Store conversation messages that have content.
+
+        Args:
+            messages (List[Dict[str, Any]]): Chat messages with "role" and "content".
+        """
+        for message in messages:
+            content = message.get("content")
+            # tool results hold an MCP content list; only their text is stored
+            if isinstance(content, list):
+                content = format_tool_response(content)
+            if not content:
+                continue
+
+            entry = f"{message['role']}: {content}"
+            tokens = Counter(_tokenize(entry))
+            self.entries.append(entry)
+            self._entry_tokens.append(tokens)
+            self._document_frequency.update(tokens.keys())
+
+    def search(self, query: str, limit: int = 3) -> List[str]:
+        """
+        Return the stored entries most relevant to a query.
+
+        Args:
+            query (str): The text to search for.
+            limit (int): The maximum number of entries to return.
+
+        Returns:
+            List[str]: Matching entries, most relevant first.
+        """
+        query_tokens = set(_tokenize(query))
+        total = len(self.entries)
+
+        scored = []
+        for index, tokens in enumerate(self._entry_tokens):
+            score = sum(
+                math.log(1 + total / self._document_frequency[token])
+                for token in query_tokens
+                if token in tokens
+            )
+            if score > 0:
+                scored.append((score, index))
+
+        # best score first; later entries win ties
+        scored.sort(reverse=True)
+        return [self.entries[index] for _, index in scored[:limit]]
+
+    async def call_tool(self, tool_name: str, arguments: dict) -> dict:
+        """
+        Handle a recall_memory tool call, returning an MCP-style tool result.
+        """
+        query = arguments.get("query") or ""
+        try:
+            limit = max(1, int(arguments.get("limit") or 3))
+        except (TypeError, ValueError):
+            limit = 3
+
+        matches = self.search(query, limit)
+        text = "\n\n".join(matches) if matches else "No matching memories."
+        return {"content": [{"type": "text", "text": text}]}
@@ -43,8 +43,8 @@ class SystemPromptGenerator:
         # set the tools config
         tool_config = tool_config or self.default_tool_config
 
-        # get the tools schema
-        tools_json_schema = json.dumps(tools, indent=2)
+        # get the tools schema, with sorted keys so the prompt is stable
+        tools_json_schema = json.dumps(tools, indent=2, sort_keys=True)
 
         # perform replacements
         prompt = self.template.replace(
@@ -0,0 +1,375 @@
+import asyncio
+
+import pytest
+from rich.markdown import Markdown
+from rich.text import Text
+from unittest.mock import patch, AsyncMock, MagicMock
+from mcpcli.chat_handler import (
+    _assistant_panel,
+    _call_tools,
+    _is_cacheable,
+    _needs_markdown,
+    process_conversation,
+    _pop_dropped_turns,
+    _request_messages,
+    _stream_completion,
+    _summarize,
+)
+
+
+async def _collect(pending, tool_cache=None, cacheable_tools=frozenset()):
+    results = [None] * len(pending)
+    async for index, result in _call_tools(pending, tool_cache, cacheable_tools):
+        results[index] = result
+    return results
+
+
+@pytest.mark.asyncio
+async def test_call_tools_matches_results_to_calls_and_returns_exceptions():
+    responses = {"toolA": {"content": "first"}, "toolB": RuntimeError("boom"), "toolC": {"content": "third"}}
+
+    def respond(tool_name, *args):
+        if isinstance(responses[tool_name], Exception):
+            raise responses[tool_name]
+        return responses[tool_name]
+
+    mock_send_call_tool = AsyncMock(side_effect=respond)
+    pending = [
+        ("call-1", "toolA", {"a": 1}, ("r1", "w1")),
+        ("call-2", "toolB", {}, ("r1", "w1")),
+        ("call-3", "toolC", {}, ("r2", "w2")),
+    ]
+
+    with patch("mcpcli.chat_handler.send_call_tool", new=mock_send_call_tool):
+        results = await _collect(pending)
+
+    assert results[0] == {"content": "first"}
+    assert isinstance(results[1], RuntimeError)
+    assert results[2] == {"content": "third"}
+    mock_send_call_tool.assert_any_await("toolA", {"a": 1}, "r1", "w1")
+
+
+@pytest.mark.asyncio
+async def test_call_tools_yields_results_as_they_complete():
+    async def fake_send_call_tool(tool_name, arguments, read_stream, write_stream):
+        await asyncio.sleep(arguments["delay"])
+        return {"content": tool_name}
+
+    pending = [
+        ("call-1", "slow", {"delay": 0.05}, ("r1", "w1")),
+        ("call-2", "fast", {"delay": 0}, ("r2", "w2")),
+    ]
+
+    with patch("mcpcli.chat_handler.send_call_tool", new=fake_send_call_tool):
+        order = [index async for index, _ in _call_tools(pending)]
+
+    assert order == [1, 0]
+
+
+@pytest.mark.asyncio
+async def test_call_tools_dispatches_to_in_process_handlers():
+    handler = MagicMock()
+    handler.call_tool = AsyncMock(return_value={"content": "local"})
+
+    with patch("mcpcli.chat_handler.send_call_tool", new=AsyncMock()) as mock_send_call_tool:
+        results = await _collect([("call-1", "recall_memory", {"query": "q"}, handler)])
+
+    assert results == [{"content": "local"}]
+    handler.call_tool.assert_awaited_once_with("recall_memory", {"query": "q"})
+    mock_send_call_tool.assert_not_awaited()
+
+
+@pytest.mark.asyncio
+async def test_call_tools_serializes_calls_to_the_same_server():
+    in_flight = {"w1": 0, "w2": 0}
+    peak = {"w1": 0, "w2": 0}
+
+    async def fake_send_call_tool(tool_name, arguments, read_stream, write_stream):
+        in_flight[write_stream] += 1
+        peak[write_stream] = max(peak[write_stream], in_flight[write_stream])
+        await asyncio.sleep(0.01)
+        in_flight[write_stream] -= 1
+        return {"content": tool_name}
+
+    pending = [
+        ("call-1", "toolA", {}, ("r1", "w1")),
+        ("call-2", "toolB", {}, ("r1", "w1")),
+        ("call-3", "toolC", {}, ("r2", "w2")),
+    ]
+
+    with patch("mcpcli.chat_handler.send_call_tool", new=fake_send_call_tool):
+        results = await _collect(pending)
+
+    assert [r["content"] for r in results] == ["toolA", "toolB", "toolC"]
+    assert peak == {"w1": 1, "w2": 1}
+
+
+def _tool_exchange(call_id):
+    return [
+        {"role": "user", "content": f"question {call_id}"},
+        {"role": "assistant", "content": "", "tool_calls": [{"id": call_id}]},
+        {"role": "tool", "tool_call_id": call_id, "content": "result"},
+        {"role": "assistant", "content": "answer"},
+    ]
+
+
+def test_pop_dropped_turns_keeps_short_history_intact():
+    history = [{"role": "system", "content": "sys"}] + _tool_exchange("a")
+
+    assert _pop_dropped_turns(history, 12) == []
+    assert len(history) == 5
+
+
+def test_pop_dropped_turns_starts_window_at_a_user_message():
+    system = {"role": "system", "content": "sys"}
+    history = [system] + _tool_exchange("a") + _tool_exchange("b")
+
+    dropped = _pop_dropped_turns(history, 6)
+
+    assert dropped == _tool_exchange("a")
+    assert history == [system] + _tool_exchange("b")
+
+
+def test_pop_dropped_turns_extends_window_back_to_the_last_user_message():
+    system = {"role": "system", "content": "sys"}
+    history = [system] + _tool_exchange("a") + _tool_exchange("b")
+
+    dropped = _pop_dropped_turns(history, 2)
+
+    assert dropped == _tool_exchange("a")
+    assert history == [system] + _tool_exchange("b")
+
+
+def test_pop_dropped_turns_keeps_history_without_an_earlier_cut():
+    history = [{"role": "system", "content": "sys"}] + _tool_exchange("a")
+
+    assert _pop_dropped_turns(history, 2) == []
+    assert len(history) == 5
+
+
+class FakeStreamingClient:
+    def __init__(self, deltas):
+        self.deltas = deltas
+
+    async def stream_completion(self, messages, tools=None):
+        for delta in self.deltas:
+            yield delta
+
+
+@pytest.mark.asyncio
+async def test_stream_completion_accumulates_text_and_tool_calls():
+    tool_call = {"id": "call-1", "type": "function", "function": {"name": "toolA", "arguments": "{}"}}
+    client = FakeStreamingClient([
+        {"response": "Hello "},
+        {"response": "world"},
+        {"tool_calls": [tool_call]},
+    ])
+
+    response, tool_calls, displayed = await _stream_completion(client, [], [])
+
+    assert response == "Hello world"
+    assert tool_calls == [tool_call]
+    assert displayed is True
+
+
+@pytest.mark.asyncio
+async def test_stream_completion_renders_markdown_once():
+    client = FakeStreamingClient([{"response": f"- item {i}\n"} for i in range(50)])
+
+    with patch("mcpcli.chat_handler.Markdown", wraps=Markdown) as markdown:
+        response, _, _ = await _stream_completion(client, [], [])
+
+    markdown.assert_called_once_with(response)
+
+
+@pytest.mark.asyncio
+async def test_stream_completion_without_text_shows_nothing():
+    client = FakeStreamingClient([{"response": ""}])
+
+    response, tool_calls, displayed = await _stream_completion(client, [], [])
+
+    assert response == ""
+    assert tool_calls == []
+    assert displayed is False
+
+
+def test_request_messages_inserts_summary_after_system_prompt():
+    system = {"role": "system", "content": "sys"}
+    history = [system] + _tool_exchange("a")
+    summary = {"role": "system", "content": "Conversation so far:\nearlier"}
+
+    messages = _request_messages(history, summary)
+
+    assert messages == [system, summary] + _tool_exchange("a")
+    assert _request_messages(history, {"role": "system", "content": ""}) is history
+
+
+@pytest.mark.asyncio
+async def test_summarize_appends_to_summary():
+    client = MagicMock()
+    client.create_completion = AsyncMock()
+    client.create_completion.side_effect = [{"response": "first"}, {"response": "second"}]
+    summary = {"role": "system", "content": ""}
+    lock = asyncio.Lock()
+
+    await _summarize(client, summary, _tool_exchange("a"), lock)
+    await _summarize(client, summary, _tool_exchange("b"), lock)
+
+    assert summary["content"] == "Conversation so far:\nfirst\nsecond"
+    prompt = client.create_completion.call_args.kwargs["messages"]
+    assert "question b" in prompt[-1]["content"]
+
+
+@pytest.mark.asyncio
+async def test_summarize_sends_tool_results_as_text():
+    client = MagicMock()
+    client.create_completion = AsyncMock(return_value={"response": "summary"})
+    messages = [{"role": "tool", "tool_call_id": "a", "content": [{"type": "text", "text": "42 rows"}]}]
+
+    await _summarize(client, {"role": "system", "content": ""}, messages, asyncio.Lock())
+
+    prompt = client.create_completion.call_args.kwargs["messages"]
+    assert prompt[-1]["content"] == "tool: 42 rows"
+
+
+@pytest.mark.parametrize(
+    "text, expected",
+    [
+        ("The table has 42 rows.", False),
+        ("Line one.\nLine two, with a comma - and a dash.", False),
+        ("Use `SELECT *` here.", True),
+        ("# Heading", True),
+        ("Results:\n- first\n- second", True),
+        ("Steps:\n1. open\n2. close", True),
+        ("| a | b |", True),
+    ],
+)
+def test_needs_markdown(text, expected):
+    assert _needs_markdown(text) is expected
+
+
+def test_assistant_panel_shows_plain_text_verbatim():
+    panel = _assistant_panel("Found 42 rows :smile:")
+
+    assert isinstance(panel.renderable, Text)
+    assert panel.renderable.plain == "Found 42 rows :smile:"
+
+
+@pytest.mark.parametrize(
+    "tool, expected",
+    [
+        ({"name": "write_query"}, False),
+        ({"name": "read", "x-cacheable": True}, True),
+        ({"name": "read", "annotations": {"readOnlyHint": True}}, True),
+        ({"name": "read", "annotations": {"readOnlyHint": True}, "x-cacheable": False}, False),
+        ({"name": "write", "x-cacheable": False}, False),
+        ({"name": "write", "annotations": {"readOnlyHint": False}}, False),
+        ({"name": "drop", "annotations": {"destructiveHint": True}}, False),
+    ],
+)
+def test_is_cacheable(tool, expected):
+    assert _is_cacheable(tool) is expected
+
+
+@pytest.mark.asyncio
+async def test_call_tools_reuses_cached_results():
+    mock_send_call_tool = AsyncMock(return_value={"content": "rows"})
+    tool_cache = {}
+    pending = [("call-1", "read", {"b": 1, "a": 2}, ("r", "w"))]
+    repeat = [("call-2", "read", {"a": 2, "b": 1}, ("r", "w"))]
+
+    with patch("mcpcli.chat_handler.send_call_tool", new=mock_send_call_tool):
+        first = await _collect(pending, tool_cache, frozenset({"read"}))
+        second = await _collect(repeat, tool_cache, frozenset({"read"}))
+
+    assert first == second == [{"content": "rows"}]
+    mock_send_call_tool.assert_awaited_once()
+
+
+@pytest.mark.asyncio
+async def test_call_tools_does_not_cache_errors():
+    mock_send_call_tool = AsyncMock(return_value={"isError": True, "error": "boom"})
+    tool_cache = {}
+    pending = [("call-1", "read", {}, ("r", "w"))]
+
+    with patch("mcpcli.chat_handler.send_call_tool", new=mock_send_call_tool):
+        await _collect(pending, tool_cache, frozenset({"read"}))
+        await _collect(pending, tool_cache, frozenset({"read"}))
+
+    assert tool_cache == {}
+    assert mock_send_call_tool.await_count == 2
+
+
+@pytest.mark.asyncio
+async def test_call_tools_clears_cache_after_non_cacheable_tool():
+    mock_send_call_tool = AsyncMock(return_value={"content": "ok"})
+    tool_cache = {}
+    cacheable_tools = frozenset({"read"})
+
+    with patch("mcpcli.chat_handler.send_call_tool", new=mock_send_call_tool):
+        await _collect([("call-1", "read", {}, ("r", "w"))], tool_cache, cacheable_tools)
+        assert len(tool_cache) == 1
+        await _collect([("call-2", "write", {}, ("r", "w"))], tool_cache, cacheable_tools)
+
+    assert tool_cache == {}
+
+
+@pytest.mark.asyncio
+async def test_call_tools_never_caches_unannotated_tools():
+    mock_send_call_tool = AsyncMock(return_value={"content": "ok"})
+    tools = [{"name": "read_query"}, {"name": "write_query"}]
+    cacheable_tools = frozenset(tool["name"] for tool in tools if _is_cacheable(tool))
+    tool_cache = {}
+    insert = [("call-1", "write_query", {"query": "INSERT INTO t VALUES (1)"}, ("r", "w"))]
+    select = [("call-2", "read_query", {"query": "SELECT * FROM t"}, ("r", "w"))]
+
+    with patch("mcpcli.chat_handler.send_call_tool", new=mock_send_call_tool):
+        for pending in (select, insert, insert, select):
+            await _collect(pending, tool_cache, cacheable_tools)
+
+    assert cacheable_tools == frozenset()
+    assert tool_cache == {}
+    assert mock_send_call_tool.await_count == 4
+
+
+@pytest.mark.asyncio
+async def test_process_conversation_summarizes_everything_outside_the_window():
+    system = {"role": "system", "content": "sys"}
+    history = [system]
+    sent = []
+
+    class FakeClient(FakeStreamingClient):
+        async def stream_completion(self, messages, tools=None):
+            sent.append(messages)
+            yield {"response": "answer"}
+
+    client = FakeClient([])
+    client.create_completion = AsyncMock(return_value={"response": "summary"})
+    memory = MagicMock()
+    inputs = [f"question {i}" for i in range(4)] + ["exit"]
+
+    session = MagicMock(prompt_async=AsyncMock(side_effect=inputs))
+    with patch("mcpcli.chat_handler._prompt_session", return_value=session):
+        await process_conversation(client, history, [], {}, [], history_window=2, memory=memory)
+
+    # every request holds just the window; every older message went to memory
+    assert all(len(messages) <= 4 for messages in sent)
+    stored = [m for call in memory.add_messages.call_args_list for m in call.args[0]]
+    assert stored + history[1:] == [
+        message
+        for i in range(4)
+        for message in ({"role": "user", "content": f"question {i}"}, {"role": "assistant", "content": "answer"})
+    ]
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("interrupt", [EOFError, KeyboardInterrupt])
+async def test_process_conversation_exits_on_end_of_input(interrupt):
+    client = FakeStreamingClient([])
+    history = [{"role": "system", "content": "sys"}]
+
+    session = MagicMock(prompt_async=AsyncMock(side_effect=interrupt))
+    with patch("mcpcli.chat_handler._prompt_session", return_value=session):
+        await process_conversation(client, history, [], {}, [])
+
+    assert history == [{"role": "system", "content": "sys"}]
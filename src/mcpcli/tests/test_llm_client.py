@@ -0,0 +1,206 @@
+import json
+
+import httpx
+import ollama
+import pytest
+from anthropic import AsyncAnthropic
+from openai import AsyncOpenAI
+from mcpcli import llm_client
+from mcpcli.llm_client import LLMClient, _ollama_messages
+
+OPENAI_COMPLETION = {
+    "id": "chatcmpl-1",
+    "object": "chat.completion",
+    "created": 0,
+    "model": "gpt-4o-mini",
+    "choices": [
+        {
+            "index": 0,
+            "finish_reason": "stop",
+            "message": {"role": "assistant", "content": "summary"},
+        }
+    ],
+}
+
+TOOL = {
+    "type": "function",
+    "function": {"name": "read_query", "description": "Run a query", "parameters": {"type": "object"}},
+}
+
+
+def _openai_client(monkeypatch, handler):
+    monkeypatch.setenv("OPENAI_API_KEY", "test-key")
+    client = LLMClient(provider="openai")
+    client._async_client = AsyncOpenAI(
+        api_key="test-key",
+        http_client=httpx.AsyncClient(transport=httpx.MockTransport(handler)),
+    )
+    return client
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("tools", [None, []])
+async def test_openai_completion_omits_empty_tools(monkeypatch, tools):
+    bodies = []
+
+    def handler(request):
+        bodies.append(json.loads(request.content))
+        return httpx.Response(200, json=OPENAI_COMPLETION)
+
+    client = _openai_client(monkeypatch, handler)
+    result = await client.create_completion(
+        messages=[{"role": "user", "content": "summarize"}], tools=tools
+    )
+
+    assert result["response"] == "summary"
+    assert "tools" not in bodies[0]
+
+
+@pytest.mark.asyncio
+async def test_openai_completion_sends_tools(monkeypatch):
+    bodies = []
+
+    def handler(request):
+        bodies.append(json.loads(request.content))
+        return httpx.Response(200, json=OPENAI_COMPLETION)
+
+    client = _openai_client(monkeypatch, handler)
+    await client.create_completion(messages=[{"role": "user", "content": "hi"}], tools=[TOOL])
+
+    assert bodies[0]["tools"] == [TOOL]
+
+
+def test_anthropic_request_omits_empty_tools(monkeypatch):
+    monkeypatch.setenv("ANTHROPIC_API_KEY", "test-key")
+    client = LLMClient(provider="anthropic", model="claude-3-5-haiku-latest")
+
+    request = client._anthropic_request([{"role": "user", "content": "hi"}], None)
+
+    assert "tools" not in request
+    assert client._anthropic_request([{"role": "user", "content": "hi"}], [TOOL])["tools"][0]["name"] == "read_query"
+
+
+TOOL_EXCHANGE = [
+    {"role": "user", "content": "How many users?"},
+    {
+        "role": "assistant",
+        "content": "I'll help you with that.",
+        "tool_calls": [{
+            "id": "call-1",
+            "type": "function",
+            "function": {"name": "read_query", "arguments": '{"query": "SELECT COUNT(*) FROM users"}'},
+        }],
+    },
+    {"role": "tool", "tool_call_id": "call-1", "name": "read_query",
+     "content": [{"type": "text", "text": "42"}]},
+]
+
+
+def test_anthropic_request_converts_assistant_tool_calls(monkeypatch):
+    monkeypatch.setenv("ANTHROPIC_API_KEY", "test-key")
+    client = LLMClient(provider="anthropic", model="claude-3-5-haiku-latest")
+
+    request = client._anthropic_request(TOOL_EXCHANGE, [TOOL])
+
+    text, tool_use = request["messages"][1]["content"]
+    assert text == {"type": "text", "text": "I'll help you with that."}
+    assert tool_use == {
+        "type": "tool_use",
+        "id": "call-1",
+        "name": "read_query",
+        "input": {"query": "SELECT COUNT(*) FROM users"},
+    }
+
+
+def test_ollama_messages_accepts_tool_exchanges():
+    messages = _ollama_messages(TOOL_EXCHANGE)
+
+    for message in messages:
+        ollama.Message(**message)
+    assert messages[1]["tool_calls"] == [
+        {"function": {"name": "read_query", "arguments": {"query": "SELECT COUNT(*) FROM users"}}}
+    ]
+    assert messages[2] == {"role": "tool", "content": "42"}
+
+
+def test_anthropic_client_keeps_its_own_http_client(monkeypatch):
+    monkeypatch.setenv("ANTHROPIC_API_KEY", "test-key")
+    client = LLMClient(provider="anthropic")
+
+    assert isinstance(client._get_async_client(), AsyncAnthropic)
+
+
+@pytest.mark.asyncio
+async def test_aclose_leaves_the_shared_http_client_open(monkeypatch):
+    monkeypatch.setenv("OPENAI_API_KEY", "test-key")
+    first = LLMClient(provider="openai")
+    second = LLMClient(provider="openai")
+    first._get_async_client()
+    second._get_async_client()
+    http_client = llm_client._http_client
+
+    await first.aclose()
+
+    assert first._async_client is None
+    assert not http_client.is_closed
+
+    await llm_client.close_http_client()
+
+    assert http_client.is_closed
+    assert llm_client._http_client is None
+
+
+def _openai_chunk(delta):
+    return {
+        "id": "chatcmpl-1",
+        "object": "chat.completion.chunk",
+        "created": 0,
+        "model": "gpt-4o-mini",
+        "choices": [{"index": 0, "delta": delta, "finish_reason": None}],
+    }
+
+
+def _tool_call_fragment(index, id=None, name=None, arguments=None):
+    fragment = {"index": index, "function": {}}
+    if id:
+        fragment.update(id=id, type="function")
+    if name:
+        fragment["function"]["name"] = name
+    if arguments:
+        fragment["function"]["arguments"] = arguments
+    return {"tool_calls": [fragment]}
+
+
+@pytest.mark.asyncio
+async def test_openai_stream_merges_tool_call_fragments(monkeypatch):
+    deltas = [
+        {"role": "assistant", "content": "Checking"},
+        _tool_call_fragment(0, id="call-a", name="read_query"),
+        _tool_call_fragment(0, arguments='{"query": '),
+        _tool_call_fragment(0, arguments='"SELECT 1"}'),
+        _tool_call_fragment(1, id="call-b", name="list_"),
+        _tool_call_fragment(1, name="tables", arguments="{}"),
+        _tool_call_fragment(2, id="call-c", name="describe_table"),
+        _tool_call_fragment(2, arguments='{"table": "users"}'),
+    ]
+    body = "".join(f"data: {json.dumps(_openai_chunk(delta))}\n\n" for delta in deltas)
+    body += "data: [DONE]\n\n"
+
+    def handler(request):
+        return httpx.Response(200, text=body, headers={"content-type": "text/event-stream"})
+
+    client = _openai_client(monkeypatch, handler)
+    results = [delta async for delta in client.stream_completion([{"role": "user", "content": "hi"}], [TOOL])]
+
+    assert results[0] == {"response": "Checking"}
+    tool_calls = [call for delta in results[1:] for call in delta["tool_calls"]]
+    assert tool_calls == [
+        {"id": "call-a", "type": "function",
+         "function": {"name": "read_query", "arguments": '{"query": "SELECT 1"}'}},
+        {"id": "call-b", "type": "function",
+         "function": {"name": "list_tables", "arguments": "{}"}},
+        {"id": "call-c", "type": "function",
+         "function": {"name": "describe_table", "arguments": '{"table": "users"}'}},
+    ]
+    # each call is yielded as soon as the next index starts
+    assert len(results) == 4
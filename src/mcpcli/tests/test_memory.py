@@ -0,0 +1,46 @@
+import pytest
+from mcpcli.memory import ConversationMemory
+
+
+def _memory():
+    memory = ConversationMemory()
+    memory.add_messages([
+        {"role": "user", "content": "The sales table lives in the analytics schema."},
+        {"role": "assistant", "content": "Noted, I will query analytics.sales."},
+        {"role": "tool", "content": None},
+        {"role": "user", "content": "Use the EUR currency for all totals."},
+    ])
+    return memory
+
+
+def test_add_messages_skips_empty_content():
+    assert len(_memory().entries) == 3
+
+
+def test_add_messages_stores_tool_results_as_text():
+    memory = ConversationMemory()
+    memory.add_messages([{"role": "tool", "content": [{"type": "text", "text": "42 rows"}]}])
+    assert memory.entries == ["tool: 42 rows"]
+
+
+def test_search_ranks_matching_entries():
+    results = _memory().search("which currency for totals?")
+    assert results == ["user: Use the EUR currency for all totals."]
+
+
+def test_search_without_matches_returns_nothing():
+    assert _memory().search("weather forecast") == []
+
+
+@pytest.mark.asyncio
+async def test_call_tool_returns_text_content():
+    result = await _memory().call_tool("recall_memory", {"query": "sales schema", "limit": 1})
+    assert result == {
+        "content": [{"type": "text", "text": "user: The sales table lives in the analytics schema."}]
+    }
+
+
+@pytest.mark.asyncio
+async def test_call_tool_reports_no_matches():
+    result = await ConversationMemory().call_tool("recall_memory", {"query": "anything"})
+    assert result["content"][0]["text"] == "No matching memories."